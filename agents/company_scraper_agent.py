@@ -1,67 +1,159 @@
-import os
 import numpy as np
+from pathlib import Path
 from typing import List, Dict, Any, Optional, Union
+import io
 import json
 import logging
-import requests
+import re
 from PyPDF2 import PdfReader
 import faiss
 import pickle
+import msgpack
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+from utils.embedding_client import get_embedding_client
+from utils.faiss_helpers import hash64, set_nprobe
 from utils.config import (
-    CompanySchema, 
-    TenderSchema, 
+    CompanySchema,
+    TenderSchema,
     RecommendationSchema,
-    VECTOR_DB_PATH, 
-    OLLAMA_HOST, 
+    VECTOR_DB_PATH,
+    OLLAMA_HOST,
     OLLAMA_MODEL,
-    OLLAMA_EMBEDDING_MODEL
+    OLLAMA_SESSION
 )
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def _extract_json(s: str) -> dict:
+    """Extract the JSON object from an LLM response deterministically
+
+    Ollama returns either clean JSON or a ```json fenced block, so two
+    linear scans for the outermost braces are enough - no DOTALL regexes
+    that can backtrack catastrophically on adversarial output.
+    """
+    s = s.strip().removeprefix('```json').removesuffix('```').strip()
+    start = s.find('{')
+    end = s.rfind('}')
+    if start < 0 or end <= start:
+        raise ValueError("No JSON object found in response")
+    payload = s[start:end + 1]
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+# Compiled once: keyword scanner for the basic extraction fallback - one
+# C-level alternation pass per line instead of one substring scan per keyword
+_KEYWORD_RE = re.compile(r'service|provide|offer|solution|product|capability|expertise|specialize')
+_SERVICE_WORDS = frozenset({"service", "provide", "offer"})
+_EXPERTISE_WORDS = frozenset({"expertise", "specialize"})
+
+# Below this corpus size GPU offload costs more in host-device transfer
+# than it saves in search time
+GPU_OFFLOAD_THRESHOLD = 500_000
+
 class CompanyScraperAgent:
     """Agent for processing company profiles and finding matching tenders"""
     
     def __init__(self):
         self.ollama_host = OLLAMA_HOST
         self.llm_model = OLLAMA_MODEL
-        self.embedding_model = OLLAMA_EMBEDDING_MODEL
-        
+
+        # Compute the store paths once instead of joining them per load
+        self.index_path = Path(VECTOR_DB_PATH) / "faiss_index.bin"
+        self.tenders_path = Path(VECTOR_DB_PATH) / "tenders.msgpack"
+        self.legacy_tenders_path = Path(VECTOR_DB_PATH) / "tenders.pkl"
+
         # Load index and tenders
         self._load_index_and_tenders()
     
     def _load_index_and_tenders(self):
         """Load the FAISS index and tenders"""
-        index_path = os.path.join(VECTOR_DB_PATH, "faiss_index.bin")
-        tenders_path = os.path.join(VECTOR_DB_PATH, "tenders.pkl")
-        
-        # Load tenders
-        if os.path.exists(tenders_path):
-            try:
-                with open(tenders_path, 'rb') as f:
-                    self.tenders = pickle.load(f)
-                logger.info(f"Loaded {len(self.tenders)} tenders")
-            except Exception as e:
-                logger.error(f"Error loading tenders: {str(e)}")
-                self.tenders = []
-        else:
-            logger.warning("No tenders file found")
-            self.tenders = []
-        
-        # Load FAISS index
-        if os.path.exists(index_path):
+        # Load tenders - opening directly and catching FileNotFoundError
+        # avoids a separate stat() per file
+        try:
+            with open(self.tenders_path, 'rb') as f:
+                records = msgpack.unpack(f, raw=False)
+            # The sidecar was written by us from validated models, so skip
+            # re-validating every field on load
+            self.tenders_by_id = {hash64(record["id"]): TenderSchema.model_construct(**record) for record in records}
+            logger.info(f"Loaded {len(self.tenders_by_id)} tenders")
+        except FileNotFoundError:
+            self._load_legacy_tenders()
+        except Exception as e:
+            logger.error(f"Error loading tenders: {str(e)}")
+            self.tenders_by_id = {}
+
+        # Load FAISS index memory-mapped: this agent only searches, so pages
+        # are faulted in on demand and worker processes share one physical copy
+        if self.index_path.exists():
+            index_path = str(self.index_path)
             try:
-                self.index = faiss.read_index(index_path)
-                logger.info(f"Loaded FAISS index with {self.index.ntotal} vectors")
+                try:
+                    self.index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+                except RuntimeError:
+                    # Some index types don't support mmapped reads
+                    self.index = faiss.read_index(index_path)
+                if isinstance(self.index, faiss.IndexIDMap):
+                    set_nprobe(self.index)
+                    logger.info(f"Loaded FAISS index with {self.index.ntotal} vectors")
+                else:
+                    # Legacy positional index: its search results are list
+                    # positions, not the hashed IDs tenders_by_id is keyed
+                    # by, so every lookup would miss. The scraper upgrades
+                    # the file on its next run.
+                    logger.warning("Ignoring legacy positional FAISS index; run a scrape to upgrade it")
+                    self.index = None
             except Exception as e:
                 logger.error(f"Error loading FAISS index: {str(e)}")
                 self.index = None
         else:
             logger.warning("No FAISS index found")
             self.index = None
-    
+
+        self._maybe_move_index_to_gpu()
+
+    def _load_legacy_tenders(self):
+        """Load the legacy pickle sidecar from before the msgpack format"""
+        try:
+            with open(self.legacy_tenders_path, 'rb') as f:
+                loaded = pickle.load(f)
+            if isinstance(loaded, list):
+                loaded = {hash64(tender.id): tender for tender in loaded}
+            self.tenders_by_id = loaded
+            logger.info(f"Loaded {len(self.tenders_by_id)} tenders from legacy pickle")
+        except FileNotFoundError:
+            logger.warning("No tenders file found")
+            self.tenders_by_id = {}
+        except Exception as e:
+            logger.error(f"Error loading tenders: {str(e)}")
+            self.tenders_by_id = {}
+
+    def _maybe_move_index_to_gpu(self):
+        """Offload the index to GPU when one is available and the corpus is large"""
+        if self.index is None or self.index.ntotal <= GPU_OFFLOAD_THRESHOLD:
+            return
+
+        try:
+            if getattr(faiss, "get_num_gpus", lambda: 0)() > 0:
+                self.index = faiss.index_cpu_to_gpu(faiss.StandardGpuResources(), 0, self.index)
+                logger.info(f"Moved FAISS index with {self.index.ntotal} vectors to GPU")
+        except AttributeError:
+            # faiss-cpu build - silently stay on the CPU path
+            pass
+        except Exception as e:
+            logger.warning(f"Could not move FAISS index to GPU: {str(e)}")
+
     def process_company_profile(self, 
                                profile_text: str = None, 
                                file_content: bytes = None, 
@@ -92,7 +184,41 @@ class CompanyScraperAgent:
                 "recommendations": []
             }
     
-    def _extract_company_info(self, 
+    def process_company_profiles(self, profile_texts: List[str]) -> List[Dict[str, Any]]:
+        """Process several company profiles and match them in one batched search"""
+        companies = []
+        results = []
+
+        for profile_text in profile_texts:
+            try:
+                company_info = self._extract_company_info(profile_text=profile_text)
+                company_info.embedding = self.get_embedding(company_info.description)
+                companies.append(company_info)
+                results.append(None)
+            except Exception as e:
+                logger.error(f"Error processing company profile: {str(e)}")
+                results.append({
+                    "status": "error",
+                    "message": f"Error processing company profile: {str(e)}",
+                    "recommendations": []
+                })
+
+        # One FAISS search covers every successfully extracted profile
+        recommendation_lists = self._find_matching_tenders_batch(companies)
+
+        company_iter = iter(zip(companies, recommendation_lists))
+        for i, result in enumerate(results):
+            if result is None:
+                company_info, recommendations = next(company_iter)
+                results[i] = {
+                    "status": "success",
+                    "company_info": company_info.model_dump(exclude={"embedding"}),
+                    "recommendations": [rec.model_dump(exclude={"tender_details.embedding"}) for rec in recommendations]
+                }
+
+        return results
+
+    def _extract_company_info(self,
                              profile_text: Optional[str] = None, 
                              file_content: Optional[bytes] = None,
                              file_type: Optional[str] = None) -> CompanySchema:
@@ -103,12 +229,10 @@ class CompanyScraperAgent:
         if file_content and file_type:
             if file_type == "pdf":
                 # Extract text from PDF
-                reader = PdfReader(file_content)
-                for page in reader.pages:
-                    text += page.extract_text() + "\n"
+                text = self._extract_pdf_text(file_content)
             elif file_type == "txt":
-                # Extract text from TXT
-                text = file_content.decode("utf-8")
+                # Extract text from TXT (file_content may be a memoryview)
+                text = str(file_content, "utf-8")
             elif file_type == "docx":
                 # Would need python-docx library for DOCX files
                 raise NotImplementedError("DOCX processing not implemented")
@@ -134,7 +258,8 @@ class CompanyScraperAgent:
         """
         
         try:
-            response = requests.post(
+            # Shared pooled session - keep-alive across generate calls
+            response = OLLAMA_SESSION.post(
                 f"{self.ollama_host}/api/generate",
                 json={"model": self.llm_model, "prompt": prompt, "stream": False}
             )
@@ -147,19 +272,8 @@ class CompanyScraperAgent:
             result = response.json()
             company_json_text = result.get("response", "")
             
-            # Extract JSON from the response
-            import re
-            json_match = re.search(r'```json(.*?)```', company_json_text, re.DOTALL)
-            if json_match:
-                company_json_text = json_match.group(1).strip()
-            else:
-                # Try to find JSON without code blocks
-                json_match = re.search(r'({.*})', company_json_text, re.DOTALL)
-                if json_match:
-                    company_json_text = json_match.group(1).strip()
-            
-            # Parse JSON
-            company_data = json.loads(company_json_text)
+            # Parse the JSON payload from the response
+            company_data = _extract_json(company_json_text)
             
             # Create CompanySchema
             return CompanySchema(
@@ -175,6 +289,25 @@ class CompanyScraperAgent:
             # Fallback to basic extraction
             return self._basic_company_extraction(text)
     
+    def _extract_pdf_text(self, file_content: bytes) -> str:
+        """Extract text from a PDF, preferring the PDFium-backed pypdfium2"""
+        if pdfium is not None:
+            pdf = pdfium.PdfDocument(io.BytesIO(file_content))
+            try:
+                # Pages are extracted sequentially on purpose: PDFium is not
+                # thread-safe and pypdfium2 adds no locking, so concurrent
+                # get_textpage() calls on one document can corrupt state or
+                # segfault. The C-level extraction is still far faster than
+                # the PyPDF2 fallback below.
+                pages_text = [pdf[i].get_textpage().get_text_range() for i in range(len(pdf))]
+            finally:
+                pdf.close()
+            return "\n".join(pages_text)
+
+        # Fallback: pure-Python PyPDF2 (joined once instead of O(N^2) +=)
+        reader = PdfReader(io.BytesIO(file_content))
+        return "\n".join(page.extract_text() or "" for page in reader.pages)
+
     def _basic_company_extraction(self, text: str) -> CompanySchema:
         """Basic extraction of company information when LLM extraction fails"""
         # Simple extraction of company name (first line or "Unknown")
@@ -185,20 +318,22 @@ class CompanyScraperAgent:
         description = text[:500] if len(text) > 500 else text
         
         # Basic keyword extraction for services (very simplistic)
-        keywords = ["service", "provide", "offer", "solution", "product", "capability", "expertise"]
         services = []
         capabilities = []
         expertise = []
-        
+
         for line in lines:
             line = line.lower()
-            if any(keyword in line for keyword in keywords):
-                if "service" in line or "provide" in line or "offer" in line:
-                    services.append(line.strip())
-                elif "capability" in line:
-                    capabilities.append(line.strip())
-                elif "expertise" in line or "specialize" in line:
-                    expertise.append(line.strip())
+            # One scan collects every keyword on the line
+            found = set(_KEYWORD_RE.findall(line))
+            if not found:
+                continue
+            if found & _SERVICE_WORDS:
+                services.append(line.strip())
+            elif "capability" in found:
+                capabilities.append(line.strip())
+            elif found & _EXPERTISE_WORDS:
+                expertise.append(line.strip())
         
         return CompanySchema(
             name=name,
@@ -209,63 +344,78 @@ class CompanyScraperAgent:
         )
     
     def get_embedding(self, text: str) -> List[float]:
-        """Get embedding from Ollama API"""
-        try:
-            response = requests.post(
-                f"{self.ollama_host}/api/embeddings",
-                json={"model": self.embedding_model, "prompt": text}
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"Error getting embedding: {response.text}")
-                # Return a zero vector as fallback
-                return [0.0] * 384  # Default embedding size
-                
-            result = response.json()
-            return result.get("embedding", [0.0] * 384)
-        except Exception as e:
-            logger.error(f"Error in get_embedding: {str(e)}")
-            return [0.0] * 384
-    
+        """Get embedding from Ollama API via the shared embedding client"""
+        return get_embedding_client().embed_one(text)
+
     def _find_matching_tenders(self, company_info: CompanySchema, top_k: int = 10) -> List[RecommendationSchema]:
         """Find matching tenders for a company profile using similarity search"""
-        if not self.index or not self.tenders or self.index.ntotal == 0:
+        results = self._find_matching_tenders_batch([company_info], top_k)
+        return results[0] if results else []
+
+    def _find_matching_tenders_batch(self, companies: List[CompanySchema], top_k: int = 10) -> List[List[RecommendationSchema]]:
+        """Find matching tenders for several company profiles in one FAISS search
+
+        Batching queries amortizes the per-search overhead (and, on GPU,
+        the host-device transfer) across all profiles.
+        """
+        if not self.index or not self.tenders_by_id or self.index.ntotal == 0:
             logger.warning("No tenders or index available for matching")
-            return []
-        
+            return [[] for _ in companies]
+
         try:
-            # Convert embedding to numpy array
-            query_vector = np.array([company_info.embedding]).astype('float32')
-            
-            # Perform similarity search
-            distances, indices = self.index.search(query_vector, min(top_k, self.index.ntotal))
-            
-            # Create recommendation objects
+            # Stack query embeddings and normalize so the inner product
+            # returned by the index is cosine similarity
+            query_vectors = np.array([company.embedding for company in companies]).astype('float32')
+
+            # get_embedding falls back to a zero vector on failure; searching
+            # with one would return arbitrary matches at a flat score, so
+            # mask failed rows out and search only the valid ones
+            valid = np.any(query_vectors, axis=1)
+            results: List[List[RecommendationSchema]] = [[] for _ in companies]
+            if not valid.all():
+                logger.warning(f"Skipping FAISS search for {int((~valid).sum())} zero-vector embeddings")
+            if not valid.any():
+                return results
+
+            valid_vectors = np.ascontiguousarray(query_vectors[valid])
+            faiss.normalize_L2(valid_vectors)
+
+            # Perform one similarity search for all valid queries
+            distances, indices = self.index.search(valid_vectors, min(top_k, self.index.ntotal))
+
+            for row, company_index in enumerate(np.flatnonzero(valid)):
+                results[company_index] = self._build_recommendations(distances[row], indices[row])
+            return results
+
+        except Exception as e:
+            logger.error(f"Error finding matching tenders: {str(e)}")
+            return [[] for _ in companies]
+
+    def _build_recommendations(self, distances_row: np.ndarray, indices_row: np.ndarray) -> List[RecommendationSchema]:
+        """Build recommendation objects from one row of FAISS search results"""
+        try:
+            # Map cosine similarities in [-1, 1] onto 0-100% scores in one
+            # NumPy pass; FAISS pads missing results with index -1
+            valid = indices_row >= 0
+            scores = np.clip((distances_row[valid] + 1.0) * 50.0, 0.0, 100.0)
+
+            # Create recommendation objects - FAISS already returns results
+            # ordered by decreasing similarity, so no re-sort is needed
             recommendations = []
-            for i in range(len(indices[0])):
-                idx = indices[0][i]
-                distance = distances[0][i]
-                
-                if idx < len(self.tenders):
-                    tender = self.tenders[idx]
-                    
-                    # Convert distance to similarity score (0-100%)
-                    # Lower distance = higher similarity
-                    similarity_score = max(0, min(100, (1.0 - distance/10) * 100))
-                    
-                    recommendation = RecommendationSchema(
+            for idx, score in zip(indices_row[valid], scores):
+                tender = self.tenders_by_id.get(int(idx))
+                if tender is not None:
+                    # Fields come from already-validated models, so build the
+                    # recommendation without re-running validation
+                    recommendations.append(RecommendationSchema.model_construct(
                         tender_id=tender.id,
                         tender_title=tender.title,
-                        similarity_score=similarity_score,
+                        similarity_score=float(score),
                         tender_details=tender
-                    )
-                    recommendations.append(recommendation)
-            
-            # Sort by similarity score (highest first)
-            recommendations.sort(key=lambda x: x.similarity_score, reverse=True)
-            
+                    ))
+
             return recommendations
-            
+
         except Exception as e:
-            logger.error(f"Error finding matching tenders: {str(e)}")
+            logger.error(f"Error building recommendations: {str(e)}")
             return []
\ No newline at end of file
@@ -4,49 +4,57 @@ import faiss
 import pickle
 import json
 import logging
+import msgpack
+from pathlib import Path
 from typing import List, Dict, Any, Optional
-from utils.config import TenderSchema, VECTOR_DB_PATH, VECTOR_DIMENSION, OLLAMA_HOST, OLLAMA_EMBEDDING_MODEL
+from utils.config import TenderSchema, VECTOR_DB_PATH, VECTOR_DIMENSION, EMBED_BATCH_SIZE
 from utils.firecrawl_wrapper import FirecrawlWrapper
+from utils.embedding_client import get_embedding_client
+from utils.faiss_helpers import IVF_NPROBE, hash64, set_nprobe
 import time
-import requests
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Below this corpus size an exhaustive flat index is still the fastest option,
+# above it we migrate to a compressed IVF,PQ index
+IVFPQ_THRESHOLD = 10_000
+
+# Concurrent raw-tender JSON writers
+RAW_WRITE_WORKERS = 16
+
 class TenderScraperAgent:
     """Agent for scraping tenders from government websites and storing them in a vector database"""
     
     def __init__(self):
         self.scraper = FirecrawlWrapper()
         self.index = None
-        self.tenders = []
-        self.embedding_model = OLLAMA_EMBEDDING_MODEL
-        self.ollama_host = OLLAMA_HOST
+        self.tenders_by_id = {}
+
+        # Compute the store paths once instead of joining them per load/save
+        self.index_path = Path(VECTOR_DB_PATH) / "faiss_index.bin"
+        self.tenders_path = Path(VECTOR_DB_PATH) / "tenders.msgpack"
+        self.legacy_tenders_path = Path(VECTOR_DB_PATH) / "tenders.pkl"
         
         # Create data directories if they don't exist
         os.makedirs(VECTOR_DB_PATH, exist_ok=True)
         os.makedirs(os.path.join(VECTOR_DB_PATH, "raw_tenders"), exist_ok=True)
     
     def get_embedding(self, text: str) -> List[float]:
-        """Get embedding from Ollama API"""
-        try:
-            response = requests.post(
-                f"{self.ollama_host}/api/embeddings",
-                json={"model": self.embedding_model, "prompt": text}
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"Error getting embedding: {response.text}")
-                # Return a zero vector as fallback
-                return [0.0] * VECTOR_DIMENSION
-                
-            result = response.json()
-            return result.get("embedding", [0.0] * VECTOR_DIMENSION)
-        except Exception as e:
-            logger.error(f"Error in get_embedding: {str(e)}")
-            return [0.0] * VECTOR_DIMENSION
-    
+        """Get embedding from Ollama API via the shared embedding client"""
+        return get_embedding_client().embed_one(text)
+
+    def get_embeddings_batch(self, texts: List[str], batch_size: int = EMBED_BATCH_SIZE) -> List[List[float]]:
+        """Get embeddings for multiple texts via the shared embedding client"""
+        return get_embedding_client().embed_batch(texts, batch_size)
+
     def scrape_and_store_tenders(self) -> Dict[str, Any]:
         """Scrape tenders and store them in vector database"""
         try:
@@ -76,33 +84,35 @@ class TenderScraperAgent:
         # Load existing index and tenders if they exist
         self._load_index_and_tenders()
         
-        embeddings = []
-        new_tenders = []
-        
-        for tender in tenders:
-            try:
-                # Generate embedding for the tender
-                text_for_embedding = f"{tender.title} {tender.description}"
-                embedding = self.get_embedding(text_for_embedding)
-                
-                # Store the embedding in the tender object
-                tender.embedding = embedding
-                new_tenders.append(tender)
-                embeddings.append(embedding)
-                
-                # Save raw tender data
-                self._save_raw_tender(tender)
-                
-            except Exception as e:
-                logger.error(f"Error processing tender {tender.id}: {str(e)}")
-        
+        # Embed all tenders in batched requests instead of one HTTP call per
+        # tender, and overlap the raw JSON writes with the embedding requests
+        # since both stages are I/O-bound
+        texts = [f"{tender.title} {tender.description}" for tender in tenders]
+
+        with ThreadPoolExecutor(max_workers=RAW_WRITE_WORKERS) as writer_pool:
+            for tender in tenders:
+                writer_pool.submit(self._save_raw_tender, tender)
+            batch_embeddings = self.get_embeddings_batch(texts)
+
+        # The FAISS index is the single store for vectors, so the tender
+        # objects themselves stay embedding-free (reconstruct() can recover
+        # a vector by ID if ever needed)
+        new_tenders = list(tenders[:len(batch_embeddings)])
+
+        # Write the vectors into one preallocated contiguous float32 buffer -
+        # FAISS requires row-major float32 and can then add without copying
+        embeddings_array = np.empty((len(new_tenders), VECTOR_DIMENSION), dtype=np.float32)
+        for i, embedding in enumerate(batch_embeddings):
+            embeddings_array[i, :] = embedding
+
         if new_tenders:
-            # Update the tenders list
-            self.tenders.extend(new_tenders)
-            
+            # Update the tender mapping keyed by stable 63-bit IDs
+            for tender in new_tenders:
+                self.tenders_by_id[hash64(tender.id)] = tender
+
             # Update or create the FAISS index
-            self._update_index(embeddings)
-            
+            self._update_index(embeddings_array, new_tenders)
+
             # Save updated index and tenders
             self._save_index_and_tenders()
             
@@ -110,61 +120,162 @@ class TenderScraperAgent:
     
     def _load_index_and_tenders(self):
         """Load existing index and tenders if they exist"""
-        index_path = os.path.join(VECTOR_DB_PATH, "faiss_index.bin")
-        tenders_path = os.path.join(VECTOR_DB_PATH, "tenders.pkl")
-        
-        # Load tenders
-        if os.path.exists(tenders_path):
-            try:
-                with open(tenders_path, 'rb') as f:
-                    self.tenders = pickle.load(f)
-                logger.info(f"Loaded {len(self.tenders)} existing tenders")
-            except Exception as e:
-                logger.error(f"Error loading tenders: {str(e)}")
-                self.tenders = []
-        
+        # Load tenders - opening directly and catching FileNotFoundError
+        # avoids a separate stat() per file
+        try:
+            with open(self.tenders_path, 'rb') as f:
+                records = msgpack.unpack(f, raw=False)
+            # The sidecar was written by us from validated models, so skip
+            # re-validating every field on load
+            self.tenders_by_id = {hash64(record["id"]): TenderSchema.model_construct(**record) for record in records}
+            logger.info(f"Loaded {len(self.tenders_by_id)} existing tenders")
+        except FileNotFoundError:
+            self._load_legacy_tenders()
+        except Exception as e:
+            logger.error(f"Error loading tenders: {str(e)}")
+            self.tenders_by_id = {}
+
         # Load index
-        if os.path.exists(index_path):
+        if self.index_path.exists():
             try:
-                self.index = faiss.read_index(index_path)
-                logger.info(f"Loaded existing FAISS index with {self.index.ntotal} vectors")
+                self.index = faiss.read_index(str(self.index_path))
+                if isinstance(self.index, faiss.IndexIDMap):
+                    set_nprobe(self.index)
+                    logger.info(f"Loaded existing FAISS index with {self.index.ntotal} vectors")
+                else:
+                    self._upgrade_legacy_index()
             except Exception as e:
                 logger.error(f"Error loading FAISS index: {str(e)}")
                 self.index = None
+
+    def _upgrade_legacy_index(self):
+        """Replace a legacy positional index with one keyed by hashed tender IDs
+
+        The pre-IDMap format stored un-normalized vectors in a flat L2 index
+        addressed by list position, which doesn't survive the hashed-ID keying
+        of tenders_by_id (and the old index types don't support add_with_ids).
+        Legacy pickles kept each tender's embedding, so the index is rebuilt
+        from those under the current layout; without them the old index is
+        unusable and only a rescrape can rebuild it.
+        """
+        self.index = None
+        tenders = [tender for tender in self.tenders_by_id.values() if tender.embedding]
+        if not tenders:
+            logger.warning("Discarding legacy positional FAISS index; rescrape to rebuild it")
+            return
+
+        embeddings_array = np.array([tender.embedding for tender in tenders], dtype=np.float32)
+        self._update_index(embeddings_array, tenders)
+        self._save_index_and_tenders()
+        logger.info(f"Upgraded legacy FAISS index: {len(tenders)} vectors re-keyed by tender ID")
+
+    def _load_legacy_tenders(self):
+        """Load the legacy pickle sidecar from before the msgpack format"""
+        try:
+            with open(self.legacy_tenders_path, 'rb') as f:
+                loaded = pickle.load(f)
+            if isinstance(loaded, list):
+                loaded = {hash64(tender.id): tender for tender in loaded}
+            self.tenders_by_id = loaded
+            logger.info(f"Loaded {len(self.tenders_by_id)} existing tenders from legacy pickle")
+        except FileNotFoundError:
+            self.tenders_by_id = {}
+        except Exception as e:
+            logger.error(f"Error loading tenders: {str(e)}")
+            self.tenders_by_id = {}
     
-    def _update_index(self, new_embeddings: List[List[float]]):
-        """Update the FAISS index with new embeddings"""
-        if not new_embeddings:
+    def _update_index(self, new_embeddings: np.ndarray, new_tenders: List[TenderSchema]):
+        """Update the FAISS index with new embeddings keyed by stable tender IDs"""
+        if new_embeddings.shape[0] == 0:
             return
-        
-        embeddings_array = np.array(new_embeddings).astype('float32')
-        
+
+        # Caller already provides a contiguous float32 array
+        embeddings_array = np.ascontiguousarray(new_embeddings, dtype=np.float32)
+        ids_array = np.fromiter((hash64(tender.id) for tender in new_tenders), dtype=np.int64)
+
+        # L2-normalize so inner-product search is exactly cosine similarity
+        faiss.normalize_L2(embeddings_array)
+
         if self.index is None:
-            # Create a new index
-            self.index = faiss.IndexFlatL2(VECTOR_DIMENSION)
-            
-        # Add new embeddings to the index
-        self.index.add(embeddings_array)
+            # Create a new index - exhaustive search is fastest for small
+            # corpora, and fp16 storage halves the bytes scanned per query
+            # compared to a float32 flat index
+            self.index = faiss.IndexIDMap2(faiss.IndexScalarQuantizer(
+                VECTOR_DIMENSION, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT
+            ))
+
+        total = self.index.ntotal + embeddings_array.shape[0]
+
+        if self._is_exhaustive_index() and total >= IVFPQ_THRESHOLD:
+            # Migrate to a compressed IVF,PQ index once the corpus is large
+            # enough to train it: memory drops ~16-32x and search cost goes
+            # from O(N) to roughly O(sqrt(N))
+            self._migrate_to_ivfpq(embeddings_array, ids_array)
+        else:
+            # Add new embeddings to the index (scalar quantizers need a
+            # one-shot train before the first add)
+            base = faiss.downcast_index(self.index.index)
+            if not base.is_trained:
+                base.train(embeddings_array)
+            self.index.add_with_ids(embeddings_array, ids_array)
+
         logger.info(f"Updated FAISS index, now contains {self.index.ntotal} vectors")
+
+    def _is_exhaustive_index(self) -> bool:
+        """Check whether the wrapped index is still the small-corpus exhaustive one"""
+        base = faiss.downcast_index(self.index.index)
+        return not isinstance(base, faiss.IndexIVF)
+
+    def _migrate_to_ivfpq(self, new_embeddings_array: np.ndarray, new_ids_array: np.ndarray):
+        """Rebuild the flat index as a trained IVF,PQ index over all vectors"""
+        # Recover the vectors and IDs already stored in the flat index
+        if self.index.ntotal > 0:
+            base = faiss.downcast_index(self.index.index)
+            existing = base.reconstruct_n(0, base.ntotal)
+            existing_ids = faiss.vector_to_array(self.index.id_map)
+            all_embeddings = np.vstack([existing, new_embeddings_array])
+            all_ids = np.concatenate([existing_ids, new_ids_array])
+        else:
+            all_embeddings = new_embeddings_array
+            all_ids = new_ids_array
+
+        total = all_embeddings.shape[0]
+        nlist = max(1, int(4 * np.sqrt(total)))
+
+        # PQ requires the dimension to be divisible by the number of subquantizers
+        m = VECTOR_DIMENSION // 8
+        while VECTOR_DIMENSION % m != 0:
+            m -= 1
+
+        logger.info(f"Training IVF{nlist},PQ{m}x8 index on {total} vectors")
+        base = faiss.index_factory(VECTOR_DIMENSION, f"IVF{nlist},PQ{m}x8", faiss.METRIC_INNER_PRODUCT)
+        base.train(all_embeddings)
+        base.nprobe = IVF_NPROBE
+
+        index = faiss.IndexIDMap2(base)
+        index.add_with_ids(all_embeddings, all_ids)
+
+        self.index = index
     
     def _save_index_and_tenders(self):
         """Save the FAISS index and tenders"""
-        index_path = os.path.join(VECTOR_DB_PATH, "faiss_index.bin")
-        tenders_path = os.path.join(VECTOR_DB_PATH, "tenders.pkl")
-        
         # Save FAISS index
         if self.index is not None:
             try:
-                faiss.write_index(self.index, index_path)
+                faiss.write_index(self.index, str(self.index_path))
                 logger.info(f"Saved FAISS index with {self.index.ntotal} vectors")
             except Exception as e:
                 logger.error(f"Error saving FAISS index: {str(e)}")
-        
-        # Save tenders
+
+        # Save tenders - the embeddings live in the FAISS index, so the
+        # sidecar only carries tender metadata
         try:
-            with open(tenders_path, 'wb') as f:
-                pickle.dump(self.tenders, f)
-            logger.info(f"Saved {len(self.tenders)} tenders")
+            with open(self.tenders_path, 'wb') as f:
+                msgpack.pack(
+                    [tender.model_dump(exclude={"embedding"}) for tender in self.tenders_by_id.values()],
+                    f, use_bin_type=True
+                )
+            logger.info(f"Saved {len(self.tenders_by_id)} tenders")
         except Exception as e:
             logger.error(f"Error saving tenders: {str(e)}")
     
@@ -172,13 +283,15 @@ class TenderScraperAgent:
         """Save raw tender data as JSON"""
         try:
             file_path = os.path.join(VECTOR_DB_PATH, "raw_tenders", f"{tender.id}.json")
-            
-            # Convert TenderSchema to dict
-            tender_dict = tender.model_dump()
-            # Remove embedding to save space
-            tender_dict.pop("embedding", None)
-            
-            with open(file_path, 'w') as f:
-                json.dump(tender_dict, f, indent=2)
+
+            # Convert TenderSchema to dict, dropping the embedding to save space
+            tender_dict = tender.model_dump(exclude={"embedding"})
+
+            if orjson is not None:
+                with open(file_path, 'wb') as f:
+                    f.write(orjson.dumps(tender_dict))
+            else:
+                with open(file_path, 'w') as f:
+                    json.dump(tender_dict, f)
         except Exception as e:
             logger.error(f"Error saving raw tender {tender.id}: {str(e)}")
\ No newline at end of file
@@ -3,38 +3,93 @@ import os
 import sys
 import time
 import logging
-import json
+import hashlib
+import threading
+import numpy as np
 from typing import List, Dict, Any, Optional
-from io import BytesIO
-import tempfile
-from scripts.run_graph import run_scrape_tenders, run_match_company_profile
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from utils.config import APP_NAME, APP_DESCRIPTION, VECTOR_DB_PATH
 
+# scripts.run_graph transitively imports langgraph, FAISS and both agents;
+# it is imported inside the handlers below so page loads don't pay for it
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+@st.cache_resource
+def _get_executor() -> ThreadPoolExecutor:
+    """Background workers for the scrape and match pipelines
+
+    The pool lets the script thread keep updating the page while they
+    run. cache_resource holds it for the life of the server process - a
+    plain module-level pool would be recreated on every script rerun.
+    """
+    return ThreadPoolExecutor(max_workers=4)
+
+def _submit_with_ctx(fn, *args):
+    """Submit fn to the shared executor with the Streamlit context attached
+
+    Cached functions called from a worker thread need the script-run
+    context, otherwise st.cache_data falls back to uncached execution.
+    """
+    ctx = get_script_run_ctx()
+
+    def runner():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*args)
+
+    return _get_executor().submit(runner)
+
+def _poll_until_done(future, message: str):
+    """Show a progress bar that advances while a background future runs
+
+    The actual work happens on the executor; this thread only sleeps in
+    200ms slices, so the page stays responsive instead of blocking inside
+    one long spinner.
+    """
+    progress = st.progress(0, text=message)
+    pct = 0
+    while not future.done():
+        time.sleep(0.2)
+        pct = min(pct + 1, 95)
+        progress.progress(pct, text=message)
+    progress.empty()
+
+def _vector_db_files() -> set:
+    """List the filenames present in the vector DB directory in one pass"""
+    if not os.path.isdir(VECTOR_DB_PATH):
+        return set()
+    return {e.name for e in os.scandir(VECTOR_DB_PATH)}
+
+@st.cache_data(ttl=10)
 def check_system_status() -> Dict[str, Any]:
-    """Check the system status - e.g., if tenders are available"""
+    """Check the system status - e.g., if tenders are available
+
+    Streamlit reruns the whole script on every widget interaction, so the
+    result is cached for a few seconds to avoid repeated directory scans.
+    """
     status = {
         "system_ready": True,
         "tender_count": 0,
         "error": None
     }
     
-    # Check if vector database exists
-    if not os.path.exists(os.path.join(VECTOR_DB_PATH, "faiss_index.bin")) or \
-       not os.path.exists(os.path.join(VECTOR_DB_PATH, "tenders.pkl")):
+    # Check if vector database exists (tenders.pkl is the legacy sidecar
+    # name) - one scandir pass instead of a stat() per expected file
+    names = _vector_db_files()
+    if "faiss_index.bin" not in names or \
+       not ("tenders.msgpack" in names or "tenders.pkl" in names):
         status["system_ready"] = False
         status["error"] = "No tender database found. Please scrape tenders first."
         return status
     
-    # Count tenders in raw_tenders directory
+    # Count tenders in raw_tenders directory - scandir avoids a stat() per entry
     try:
         tender_dir = os.path.join(VECTOR_DB_PATH, "raw_tenders")
         if os.path.exists(tender_dir):
-            tenders = [f for f in os.listdir(tender_dir) if f.endswith('.json')]
-            status["tender_count"] = len(tenders)
+            status["tender_count"] = sum(1 for e in os.scandir(tender_dir) if e.name.endswith('.json'))
     except Exception as e:
         logger.error(f"Error counting tenders: {str(e)}")
     
@@ -42,13 +97,36 @@ def check_system_status() -> Dict[str, Any]:
 
 def run_tender_scraping():
     """Run the tender scraping process"""
-    with st.spinner("Scraping government tenders... This may take a few minutes..."):
-        try:
-            result = run_scrape_tenders()
-            return result
-        except Exception as e:
-            logger.error(f"Error scraping tenders: {str(e)}")
-            return {"error": f"Error scraping tenders: {str(e)}"}
+    from scripts.run_graph import run_scrape_tenders
+
+    try:
+        # Run the scrape on the background pool and poll for completion
+        future = _submit_with_ctx(run_scrape_tenders)
+        _poll_until_done(future, "Scraping government tenders... This may take a few minutes...")
+        result = future.result()
+        # Bust the cached status so the sidebar reflects the new tenders
+        check_system_status.clear()
+        return result
+    except Exception as e:
+        logger.error(f"Error scraping tenders: {str(e)}")
+        return {"error": f"Error scraping tenders: {str(e)}"}
+
+@st.cache_data(ttl=3600, max_entries=128)
+def _cached_match(profile_key: str, file_key: str, file_type: Optional[str],
+                  _profile_text: Optional[str], _file_content):
+    """Run the matching graph, cached by content hash of the inputs
+
+    Re-running the same profile while tweaking the result filters was
+    re-embedding it and re-searching FAISS every time. The payloads are
+    passed as underscore arguments so only the cheap digests are hashed
+    for the cache key.
+    """
+    from scripts.run_graph import run_match_company_profile
+    return run_match_company_profile(
+        profile_text=_profile_text,
+        file_content=_file_content,
+        file_type=file_type
+    )
 
 def run_company_matching(profile_text: Optional[str] = None, uploaded_file = None):
     """Run the company matching process"""
@@ -59,43 +137,47 @@ def run_company_matching(profile_text: Optional[str] = None, uploaded_file = Non
     if uploaded_file is not None:
         try:
             file_type = uploaded_file.name.split('.')[-1].lower()
-            file_content = uploaded_file.getvalue()
+            # getbuffer() is a zero-copy view of the upload, unlike
+            # getvalue() which duplicates the whole file; reset the cursor
+            # afterwards so reruns can read the upload again
+            file_content = uploaded_file.getbuffer()
+            uploaded_file.seek(0)
         except Exception as e:
             logger.error(f"Error processing uploaded file: {str(e)}")
             return {"error": f"Error processing uploaded file: {str(e)}"}
     
-    with st.spinner("Matching your company profile with relevant tenders..."):
-        try:
-            if file_content:
-                # Create temporary file for processing
-                with tempfile.NamedTemporaryFile(suffix=f'.{file_type}', delete=False) as temp_file:
-                    temp_file.write(file_content)
-                    temp_filepath = temp_file.name
-                
-                try:
-                    result = run_match_company_profile(profile_text=profile_text, file_path=temp_filepath)
-                finally:
-                    # Clean up temporary file
-                    if os.path.exists(temp_filepath):
-                        os.unlink(temp_filepath)
-            else:
-                result = run_match_company_profile(profile_text=profile_text)
-            
-            return result
-        except Exception as e:
-            logger.error(f"Error matching company profile: {str(e)}")
-            return {"error": f"Error matching company profile: {str(e)}"}
+    try:
+        # The upload bytes are already in memory; hand them straight to
+        # the graph instead of round-tripping through a temp file
+        profile_key = hashlib.blake2b(
+            (profile_text or "").encode(), digest_size=16
+        ).hexdigest()
+        file_key = hashlib.blake2b(
+            file_content or b"", digest_size=16
+        ).hexdigest()
+
+        # Run the match on the background pool and poll for completion
+        future = _submit_with_ctx(_cached_match, profile_key, file_key,
+                                  file_type, profile_text, file_content)
+        _poll_until_done(future, "Matching your company profile with relevant tenders...")
+        return future.result()
+    except Exception as e:
+        logger.error(f"Error matching company profile: {str(e)}")
+        return {"error": f"Error matching company profile: {str(e)}"}
 
 def display_tender_details(tender: Dict[str, Any]):
     """Display detailed information about a tender"""
     st.subheader(tender.get("title", "Unknown Tender"))
     
-    # Format amount as currency if available
-    amount = tender.get("amount")
-    if amount:
-        amount_str = f"₹{amount:,.2f}" if isinstance(amount, (int, float)) else str(amount)
-    else:
-        amount_str = "Not specified"
+    # Amount is preformatted once per result set in _get_rec_view; only
+    # format here when the dict didn't pass through that view
+    amount_str = tender.get("_amount_str")
+    if amount_str is None:
+        amount = tender.get("amount")
+        if amount:
+            amount_str = f"₹{amount:,.2f}" if isinstance(amount, (int, float)) else str(amount)
+        else:
+            amount_str = "Not specified"
     
     # Display tender info in columns
     col1, col2 = st.columns(2)
@@ -117,6 +199,29 @@ def display_tender_details(tender: Dict[str, Any]):
     if tender.get("url"):
         st.markdown(f"[View Original Tender]({tender.get('url')})")
 
+@st.fragment(run_every=10)
+def _render_sidebar_status():
+    """Render the sidebar status block as an independently rerunning fragment
+
+    run_every matches the status cache TTL so the block refreshes itself
+    without a full page rerun. Everything is written with plain st.* calls
+    so it lands in the fragment's own container (the caller places it in
+    the sidebar with `with st.sidebar:`) - writes to outside containers
+    aren't cleared on fragment reruns and would pile up a duplicate block
+    every refresh.
+    """
+    system_status = check_system_status()
+
+    st.markdown("---")
+    st.subheader("System Status")
+
+    status_color = "green" if system_status["system_ready"] else "red"
+    st.markdown(f"Status: :{status_color}[{'Ready' if system_status['system_ready'] else 'Not Ready'}]")
+    st.markdown(f"Tenders in Database: {system_status['tender_count']}")
+
+    if system_status["error"]:
+        st.error(system_status["error"])
+
 def main():
     """Main Streamlit application"""
     # Set page config
@@ -134,20 +239,15 @@ def main():
     # Check system status
     system_status = check_system_status()
     
-    # Create sidebar
+    # Create sidebar - the navigation radio stays outside the fragment
+    # because switching pages needs a full rerun
     st.sidebar.title("Navigation")
     page = st.sidebar.radio("Select Page", ["Match Company Profile", "Scrape Tenders", "System Status"])
-    
-    # System status section in sidebar
-    st.sidebar.markdown("---")
-    st.sidebar.subheader("System Status")
-    
-    status_color = "green" if system_status["system_ready"] else "red"
-    st.sidebar.markdown(f"Status: :{status_color}[{'Ready' if system_status['system_ready'] else 'Not Ready'}]")
-    st.sidebar.markdown(f"Tenders in Database: {system_status['tender_count']}")
-    
-    if system_status["error"]:
-        st.sidebar.error(system_status["error"])
+
+    # System status section in sidebar - the fragment must render inside
+    # the sidebar container so its reruns replace the block in place
+    with st.sidebar:
+        _render_sidebar_status()
     
     # Main content based on selected page
     if page == "Match Company Profile":
@@ -174,19 +274,17 @@ def main():
                     if not company_name or not company_description:
                         st.error("Please provide at least the company name and description.")
                     else:
-                        # Format the profile text
-                        profile_text = f"""
-                        Company Name: {company_name}
-                        
-                        Description:
-                        {company_description}
-                        
-                        Services:
-                        {company_services}
-                        
-                        Capabilities:
-                        {company_capabilities}
-                        """
+                        # Format the profile text without the indentation a
+                        # triple-quoted template would embed - the whole blob
+                        # is tokenized by the embedding model, so whitespace
+                        # tokens and empty sections are dropped up front
+                        sections = [f"Company Name: {company_name}", "",
+                                    "Description:", company_description]
+                        if company_services.strip():
+                            sections += ["", "Services:", company_services.strip()]
+                        if company_capabilities.strip():
+                            sections += ["", "Capabilities:", company_capabilities.strip()]
+                        profile_text = "\n".join(sections)
                         
                         # Run matching
                         result = run_company_matching(profile_text=profile_text)
@@ -251,14 +349,53 @@ def main():
         st.markdown("### Environment")
         st.code(f"Python version: {sys.version}")
         
-        # Check if vector database files exist
+        # Check if vector database files exist - one directory pass
         st.subheader("Files")
-        index_exists = os.path.exists(os.path.join(VECTOR_DB_PATH, "faiss_index.bin"))
-        tenders_exists = os.path.exists(os.path.join(VECTOR_DB_PATH, "tenders.pkl"))
+        names = _vector_db_files()
+        index_exists = "faiss_index.bin" in names
+        tenders_exists = "tenders.msgpack" in names or "tenders.pkl" in names
         
         st.markdown(f"FAISS Index: {'✅ Found' if index_exists else '❌ Missing'}")
         st.markdown(f"Tenders File: {'✅ Found' if tenders_exists else '❌ Missing'}")
 
+def _get_rec_view(recs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Get the structure-of-arrays view of the recommendations
+
+    Streamlit reruns the whole script on every slider or multiselect change,
+    so the per-row dict.get chains are hoisted into parallel NumPy columns
+    built once per result set and kept in session state (invalidated by
+    object identity). Filtering and sorting then run on the columns; only
+    the rows that actually render materialize their dicts.
+    """
+    view = st.session_state.get("rec_view")
+    if view is None or view["raw"] is not recs:
+        view = {
+            "score": np.fromiter(
+                (rec.get('similarity_score', 0) for rec in recs),
+                dtype=np.float32, count=len(recs)
+            ),
+            "source": np.array(
+                [rec.get('tender_details', {}).get('source', 'Unknown') for rec in recs]
+            ),
+            "title": np.array(
+                [rec.get('tender_title', 'Unknown Tender') for rec in recs]
+            ),
+            "raw": recs,
+        }
+        # Precompute the formatted amount once per tender; the dicts are
+        # reused across reruns so every later render just reads the string
+        for rec in recs:
+            tender = rec.get('tender_details', {})
+            amount = tender.get('amount')
+            if isinstance(amount, (int, float)):
+                tender['_amount_str'] = f"₹{amount:,.2f}"
+            elif amount:
+                tender['_amount_str'] = str(amount)
+            else:
+                tender['_amount_str'] = "Not specified"
+        st.session_state["rec_view"] = view
+    return view
+
 def display_matching_results(result: Dict[str, Any]):
     """Display the matching results"""
     # Display company profile
@@ -291,39 +428,43 @@ def display_matching_results(result: Dict[str, Any]):
         recs = result["recommendations"]
         
         st.subheader(f"Found {len(recs)} Matching Tenders")
-        
-        # Sort by similarity score
-        recs.sort(key=lambda x: x.get('similarity_score', 0), reverse=True)
-        
+
+        # Parallel column arrays for vectorized sorting and filtering
+        view = _get_rec_view(recs)
+        scores, sources, titles = view["score"], view["source"], view["title"]
+
+        # Sort by similarity score (descending)
+        order = np.argsort(-scores, kind="stable")
+
         # Display filters
         st.markdown("### Filter Results")
         col1, col2 = st.columns(2)
-        
+
         with col1:
-            # Get unique sources
-            sources = list(set(rec.get('tender_details', {}).get('source', 'Unknown') for rec in recs))
-            selected_sources = st.multiselect("Filter by Source", options=sources, default=sources)
-        
+            # Get unique sources - dict.fromkeys keeps first-seen order, so
+            # the multiselect options stay stable across reruns (a set here
+            # reshuffled them and defeated Streamlit's widget diffing)
+            source_options = [str(s) for s in dict.fromkeys(sources)]
+            selected_sources = st.multiselect("Filter by Source", options=source_options, default=source_options)
+
         with col2:
             # Show slider for minimum similarity score
             min_similarity = st.slider("Minimum Similarity Score (%)", 0, 100, 50)
-        
-        # Filter recommendations
-        filtered_recs = [
-            rec for rec in recs 
-            if rec.get('similarity_score', 0) >= min_similarity and
-            rec.get('tender_details', {}).get('source', 'Unknown') in selected_sources
-        ]
-        
-        if not filtered_recs:
+
+        # Filter recommendations with one boolean mask instead of per-row
+        # dict lookups, keeping the sorted order
+        mask = (scores >= min_similarity) & np.isin(sources, selected_sources)
+        kept = order[mask[order]]
+
+        if kept.size == 0:
             st.warning("No tenders match your current filters. Try adjusting the filters.")
         else:
-            st.markdown(f"Showing {len(filtered_recs)} tenders matching your filters")
-            
-            # Display tenders
-            for i, rec in enumerate(filtered_recs):
-                with st.expander(f"{i+1}. {rec.get('tender_title', 'Unknown Tender')} - {rec.get('similarity_score', 0):.2f}% Match"):
-                    tender = rec.get("tender_details", {})
+            st.markdown(f"Showing {kept.size} tenders matching your filters")
+
+            # Display tenders - only the rendered rows touch the dicts
+            for n, i in enumerate(kept, 1):
+                with st.expander(f"{n}. {titles[i]} - {scores[i]:.2f}% Match"):
+                    tender = recs[i].get("tender_details", {})
                     display_tender_details(tender)
 
 if __name__ == "__main__":
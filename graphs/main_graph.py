@@ -1,5 +1,7 @@
 import os
-from typing import Dict, List, Any, TypedDict, Annotated
+import functools
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Union
 from langgraph.graph import StateGraph, END
 from langgraph.graph.message import MessagesState
 import logging
@@ -11,80 +13,90 @@ from utils.config import CompanySchema, RecommendationSchema
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Define the state for our LangGraph
-class GraphState(TypedDict):
+# Define the state for our LangGraph - a slotted dataclass instead of a
+# TypedDict, so the nodes use attribute access rather than string-keyed
+# dict lookups and each state instance skips the per-instance __dict__
+@dataclass(slots=True)
+class GraphState:
     # User inputs
-    input_type: str  # "company_profile" or "scrape_tenders"
-    profile_text: str
-    file_content: bytes
-    file_type: str
-    
+    input_type: str = ""  # "company_profile" or "scrape_tenders"
+    profile_text: str = ""
+    file_content: Union[bytes, memoryview] = b""  # uploads arrive as a zero-copy view
+    file_type: str = ""
+
     # Processing states
-    scraping_status: Dict[str, Any]
-    company_profile: Dict[str, Any]
-    
+    scraping_status: Dict[str, Any] = field(default_factory=dict)
+    company_profile: Dict[str, Any] = field(default_factory=dict)
+
     # Results
-    recommendations: List[Dict[str, Any]]
-    error: str
+    recommendations: List[Dict[str, Any]] = field(default_factory=list)
+    error: str = ""
 
-def initialize_agents() -> tuple:
-    """Initialize the tender and company agents"""
-    tender_agent = TenderScraperAgent()
-    company_agent = CompanyScraperAgent()
-    return tender_agent, company_agent
+# Each agent is built once per process, and only by the node that uses it -
+# constructing both together made the scrape path load the company agent's
+# FAISS index (and vice versa) for nothing
+@functools.lru_cache(maxsize=1)
+def get_tender_agent() -> TenderScraperAgent:
+    """Get the process-wide tender scraper agent, creating it on first use"""
+    return TenderScraperAgent()
+
+@functools.lru_cache(maxsize=1)
+def get_company_agent() -> CompanyScraperAgent:
+    """Get the process-wide company scraper agent, creating it on first use"""
+    return CompanyScraperAgent()
 
 # Define graph nodes (functions)
 def route_request(state: GraphState) -> str:
     """Route the request based on input type"""
-    logger.info(f"Routing request with input_type: {state.get('input_type')}")
-    
-    if state.get("input_type") == "scrape_tenders":
+    logger.info(f"Routing request with input_type: {state.input_type}")
+
+    if state.input_type == "scrape_tenders":
         return "scrape_tenders"
-    elif state.get("input_type") == "company_profile":
+    elif state.input_type == "company_profile":
         return "process_company_profile"
     else:
-        state["error"] = "Invalid input type. Must be 'scrape_tenders' or 'company_profile'."
+        state.error = "Invalid input type. Must be 'scrape_tenders' or 'company_profile'."
         return END
 
 def scrape_tenders(state: GraphState) -> GraphState:
     """Node for scraping tenders"""
     logger.info("Starting tender scraping process")
-    tender_agent, _ = initialize_agents()
+    tender_agent = get_tender_agent()
     
     try:
         result = tender_agent.scrape_and_store_tenders()
-        state["scraping_status"] = result
-        
+        state.scraping_status = result
+
         if result.get("status") == "error":
-            state["error"] = result.get("message", "Unknown error during tender scraping")
+            state.error = result.get("message", "Unknown error during tender scraping")
     except Exception as e:
         logger.error(f"Error in scrape_tenders: {str(e)}")
-        state["error"] = f"Error scraping tenders: {str(e)}"
-        state["scraping_status"] = {"status": "error", "message": str(e)}
-    
+        state.error = f"Error scraping tenders: {str(e)}"
+        state.scraping_status = {"status": "error", "message": str(e)}
+
     return state
 
 def process_company_profile(state: GraphState) -> GraphState:
     """Node for processing company profile and finding matching tenders"""
     logger.info("Processing company profile")
-    _, company_agent = initialize_agents()
+    company_agent = get_company_agent()
     
     try:
         result = company_agent.process_company_profile(
-            profile_text=state.get("profile_text"),
-            file_content=state.get("file_content"),
-            file_type=state.get("file_type")
+            profile_text=state.profile_text,
+            file_content=state.file_content,
+            file_type=state.file_type
         )
-        
+
         if result.get("status") == "success":
-            state["company_profile"] = result.get("company_info", {})
-            state["recommendations"] = result.get("recommendations", [])
+            state.company_profile = result.get("company_info", {})
+            state.recommendations = result.get("recommendations", [])
         else:
-            state["error"] = result.get("message", "Unknown error processing company profile")
+            state.error = result.get("message", "Unknown error processing company profile")
     except Exception as e:
         logger.error(f"Error in process_company_profile: {str(e)}")
-        state["error"] = f"Error processing company profile: {str(e)}"
-    
+        state.error = f"Error processing company profile: {str(e)}"
+
     return state
 
 # Build the LangGraph
@@ -118,6 +130,11 @@ def build_graph() -> StateGraph:
     
     return graph
 
-def get_tender_matching_graph() -> StateGraph:
-    """Get the initialized LangGraph"""
-    return build_graph()
\ No newline at end of file
+@functools.lru_cache(maxsize=1)
+def get_tender_matching_graph():
+    """Get the compiled LangGraph, building it once per process
+
+    Rebuilding the StateGraph (and re-instantiating the agents inside the
+    nodes) on every invocation was pure overhead on each Streamlit click.
+    """
+    return build_graph().compile()
\ No newline at end of file
@@ -1,10 +1,11 @@
 import sys
 import os
 import argparse
-import json
 import logging
 from typing import Dict, Any, Optional
-from graphs.main_graph import get_tender_matching_graph
+
+# graphs.main_graph pulls in langgraph, FAISS and both agents - deferred to
+# first use so importing this module (e.g. from the Streamlit app) is cheap
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -43,8 +44,9 @@ def read_file_content(file_path: str) -> tuple:
 def run_scrape_tenders() -> Dict[str, Any]:
     """Run the tender scraping process"""
     logger.info("Running tender scraping process")
-    
-    # Initialize the graph
+
+    # Initialize the graph (import deferred; the compiled graph is cached)
+    from graphs.main_graph import get_tender_matching_graph
     graph = get_tender_matching_graph()
     
     # Prepare the initial state
@@ -64,23 +66,33 @@ def run_scrape_tenders() -> Dict[str, Any]:
     
     return result
 
-def run_match_company_profile(profile_text: Optional[str] = None, file_path: Optional[str] = None) -> Dict[str, Any]:
-    """Run the company profile matching process"""
+def run_match_company_profile(profile_text: Optional[str] = None,
+                              file_path: Optional[str] = None,
+                              file_content: Optional[bytes] = None,
+                              file_type: Optional[str] = None) -> Dict[str, Any]:
+    """Run the company profile matching process
+
+    File input can be passed either as a path (CLI) or directly as bytes
+    (Streamlit uploads), avoiding a temp-file write and re-read for content
+    that is already in memory.
+    """
     logger.info("Running company profile matching process")
-    
-    # Initialize the graph
+
+    # Initialize the graph (import deferred; the compiled graph is cached)
+    from graphs.main_graph import get_tender_matching_graph
     graph = get_tender_matching_graph()
-    
-    # Process file if provided
-    file_content = b""
-    file_type = ""
-    if file_path:
+
+    # Read the file from disk only when raw bytes weren't supplied
+    if file_path and file_content is None:
         try:
             file_content, file_type = read_file_content(file_path)
         except Exception as e:
             logger.error(f"Error reading file: {str(e)}")
             return {"error": f"Error reading file: {str(e)}"}
-    
+
+    file_content = file_content or b""
+    file_type = file_type or ""
+
     # Prepare the initial state
     initial_state = {
         "input_type": "company_profile",
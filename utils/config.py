@@ -1,6 +1,8 @@
 import os
+import requests
+from requests.adapters import HTTPAdapter, Retry
 from dotenv import load_dotenv
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import List, Dict, Optional
 
 # Load environment variables
@@ -11,10 +13,26 @@ OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3")
 OLLAMA_EMBEDDING_MODEL = os.getenv("OLLAMA_EMBEDDING_MODEL", "nomic-embed-text")
 
+# One connection-pooled session shared by every Ollama caller (embeddings
+# and generation), so a bulk scrape reuses keep-alive connections instead
+# of opening a fresh TCP connection per request
+OLLAMA_SESSION = requests.Session()
+_ollama_adapter = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.2)
+)
+OLLAMA_SESSION.mount('http://', _ollama_adapter)
+OLLAMA_SESSION.mount('https://', _ollama_adapter)
+
 # Vector database configuration
 VECTOR_DB_PATH = os.getenv("VECTOR_DB_PATH", "./data/vector_db")
 VECTOR_DIMENSION = int(os.getenv("VECTOR_DIMENSION", "384"))  # Depends on the embedding model
 
+# Texts per /api/embed request - large enough to amortize per-request
+# overhead without making individual requests time out
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+
 # Tender sources
 TENDER_SOURCES = [
     {
@@ -40,8 +58,11 @@ TENDER_SOURCES = [
     # Add more tender sites as needed
 ]
 
-# Data schema models
+# Data schema models - data we persisted ourselves is re-materialized with
+# model_construct() in the agents, skipping per-field validation
 class TenderSchema(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     id: str
     title: str
     description: str
@@ -53,10 +74,15 @@ class TenderSchema(BaseModel):
     department: Optional[str] = None
     location: Optional[str] = None
     publication_date: Optional[str] = None
-    raw_text: str
+    # Source HTML of the listing element - usually the largest string in the
+    # schema and unused by matching, so it is only kept when the scraper is
+    # explicitly asked to (SCRAPER_KEEP_RAW_TEXT=1)
+    raw_text: Optional[str] = None
     embedding: Optional[List[float]] = None
 
 class CompanySchema(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     name: str
     description: str
     services: List[str]
@@ -65,6 +91,8 @@ class CompanySchema(BaseModel):
     embedding: Optional[List[float]] = None
 
 class RecommendationSchema(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     tender_id: str
     tender_title: str
     similarity_score: float
@@ -0,0 +1,190 @@
+import os
+import hashlib
+import functools
+import logging
+from typing import List, Optional
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from utils.config import (
+    VECTOR_DB_PATH, VECTOR_DIMENSION, OLLAMA_HOST, OLLAMA_EMBEDDING_MODEL,
+    EMBED_BATCH_SIZE, OLLAMA_SESSION
+)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Concurrent in-flight embedding batches
+EMBED_WORKERS = 8
+
+def _parse_response(response) -> dict:
+    """Decode an Ollama JSON response, preferring orjson's C decoder
+
+    Embedding responses are dominated by large float lists, which orjson
+    decodes several times faster than stdlib json.
+    """
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+def _embedding_cache_path(text: str) -> str:
+    """Path of the cached embedding for a text, keyed by its SHA-256"""
+    key = hashlib.sha256(text.encode()).hexdigest()
+    return os.path.join(VECTOR_DB_PATH, "emb_cache", key[:2], f"{key}.npy")
+
+def _load_cached_embedding(text: str) -> Optional[np.ndarray]:
+    """Load a previously cached embedding, or None on a cache miss"""
+    path = _embedding_cache_path(text)
+    if os.path.exists(path):
+        try:
+            return np.load(path)
+        except Exception as e:
+            logger.warning(f"Error loading cached embedding: {str(e)}")
+    return None
+
+def _store_cached_embedding(text: str, embedding: List[float]):
+    """Cache an embedding on disk so re-runs skip the Ollama call"""
+    try:
+        path = _embedding_cache_path(text)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.save(path, np.asarray(embedding, dtype=np.float32))
+    except Exception as e:
+        logger.warning(f"Error caching embedding: {str(e)}")
+
+class EmbeddingClient:
+    """Shared Ollama embedding client with connection pooling and a disk cache
+
+    Both agents used to carry near-identical copies of get_embedding, each
+    paying a fresh TCP handshake per call. This client keeps a pooled
+    session alive across all embedding requests.
+    """
+
+    def __init__(self, host: str, model: str):
+        self.host = host
+        self.model = model
+        # One pooled session is shared by every Ollama caller in the process
+        self.session = OLLAMA_SESSION
+
+        # In-memory memo in front of the disk cache, so repeated texts in
+        # one process skip even the .npy read
+        self._embed_one_memo = functools.lru_cache(maxsize=256)(self._embed_one_uncached)
+
+    def embed_one(self, text: str) -> List[float]:
+        """Get one embedding, using the in-memory and disk caches when possible"""
+        try:
+            # Copy the memoized list so callers can't mutate the cached entry
+            return list(self._embed_one_memo(text))
+        except Exception as e:
+            logger.error(f"Error in embed_one: {str(e)}")
+            # Return a zero vector as fallback
+            return [0.0] * VECTOR_DIMENSION
+
+    def _embed_one_uncached(self, text: str) -> List[float]:
+        """Get one embedding, using the disk cache when possible
+
+        Failures raise instead of returning the zero-vector fallback:
+        lru_cache doesn't memoize exceptions, so a transient outage isn't
+        pinned as a zero vector for the life of the process (the disk
+        cache refuses to store zero vectors for the same reason). embed_one
+        translates the error into the fallback for callers.
+        """
+        cached = _load_cached_embedding(text)
+        if cached is not None:
+            return cached.tolist()
+
+        response = self.session.post(
+            f"{self.host}/api/embeddings",
+            json={"model": self.model, "prompt": text}
+        )
+
+        if response.status_code != 200:
+            raise RuntimeError(f"Error getting embedding: {response.text}")
+
+        result = _parse_response(response)
+        embedding = result.get("embedding")
+        if not embedding or not any(embedding):
+            raise RuntimeError("Empty embedding in response")
+
+        _store_cached_embedding(text, embedding)
+        return embedding
+
+    def embed_batch(self, texts: List[str], batch_size: int = EMBED_BATCH_SIZE) -> List[List[float]]:
+        """Get embeddings for multiple texts in batched requests to Ollama's /api/embed"""
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+
+        # Serve cache hits from disk and only embed the remaining texts
+        miss_positions = []
+        for i, text in enumerate(texts):
+            cached = _load_cached_embedding(text)
+            if cached is not None:
+                embeddings[i] = cached.tolist()
+            else:
+                miss_positions.append(i)
+
+        if miss_positions:
+            miss_texts = [texts[i] for i in miss_positions]
+            miss_embeddings = self._embed_texts(miss_texts, batch_size)
+            for position, embedding in zip(miss_positions, miss_embeddings):
+                embeddings[position] = embedding
+                if any(embedding):
+                    _store_cached_embedding(texts[position], embedding)
+
+        return embeddings
+
+    def _embed_texts(self, texts: List[str], batch_size: int) -> List[List[float]]:
+        """Embed texts in concurrent batched requests"""
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+
+        if not batches:
+            return []
+        if len(batches) == 1:
+            return self._embed_batch_request(batches[0])
+
+        # Keep several batches in flight so HTTP latency is hidden while
+        # Ollama works through the queue
+        embeddings = []
+        with ThreadPoolExecutor(max_workers=EMBED_WORKERS) as pool:
+            for batch_embeddings in pool.map(self._embed_batch_request, batches):
+                embeddings.extend(batch_embeddings)
+        return embeddings
+
+    def _embed_batch_request(self, batch: List[str]) -> List[List[float]]:
+        """Embed a single batch of texts, falling back to per-text requests on failure"""
+        try:
+            response = self.session.post(
+                f"{self.host}/api/embed",
+                json={"model": self.model, "input": batch},
+                timeout=60
+            )
+
+            if response.status_code != 200:
+                logger.error(f"Error getting batch embeddings: {response.text}")
+                return [self.embed_one(text) for text in batch]
+
+            result = _parse_response(response)
+            batch_embeddings = result.get("embeddings")
+
+            if batch_embeddings is None or len(batch_embeddings) != len(batch):
+                # Older Ollama versions don't support /api/embed; fall back per text
+                logger.warning("No embeddings in batch response, falling back to per-text requests")
+                return [self.embed_one(text) for text in batch]
+
+            return batch_embeddings
+        except Exception as e:
+            logger.error(f"Error in _embed_batch_request: {str(e)}")
+            return [self.embed_one(text) for text in batch]
+
+# Module-level singleton shared by both agents
+_default_client: Optional[EmbeddingClient] = None
+
+def get_embedding_client() -> EmbeddingClient:
+    """Get the process-wide embedding client, creating it on first use"""
+    global _default_client
+    if _default_client is None:
+        _default_client = EmbeddingClient(OLLAMA_HOST, OLLAMA_EMBEDDING_MODEL)
+    return _default_client
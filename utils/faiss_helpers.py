@@ -0,0 +1,29 @@
+import hashlib
+import logging
+
+import faiss
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Number of Voronoi cells probed when searching an IVF index
+IVF_NPROBE = 16
+
+def set_nprobe(index):
+    """Set the number of probed cells on IVF indexes (no-op for flat indexes)"""
+    try:
+        faiss.extract_index_ivf(index).nprobe = IVF_NPROBE
+    except RuntimeError:
+        pass
+
+def hash64(tender_id: str) -> int:
+    """Stable 63-bit integer ID for a tender, usable as a FAISS vector ID
+
+    This is the contract between the scraper (which writes vectors under
+    these IDs) and the matcher (which looks search results up by them) -
+    both sides must hash identically or lookups miss silently, which is
+    why it lives here rather than being copied into each agent.
+    """
+    digest = hashlib.sha1(tender_id.encode()).digest()
+    return int.from_bytes(digest[:8], "big") & 0x7FFFFFFFFFFFFFFF
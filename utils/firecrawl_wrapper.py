@@ -1,212 +1,552 @@
 import os
+import re
+import random
+import asyncio
+import functools
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
 from typing import List, Dict, Any, Optional
-import requests
-from bs4 import BeautifulSoup
+import aiohttp
+import diskcache
+import msgpack
+import lxml.html
+from lxml import etree
 import logging
 from firecrawl import FireCrawl
-from utils.config import TenderSchema, TENDER_SOURCES
+from utils.config import TenderSchema, TENDER_SOURCES, VECTOR_DB_PATH
 import time
-import random
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Cap on concurrent fetches (total and per host)
+FETCH_CONCURRENCY = 64
+
+# Give up on unresponsive hosts instead of hanging the whole scrape
+FETCH_TIMEOUT = aiohttp.ClientTimeout(sock_connect=5, total=30)
+
+# Cached pages expire after a day even without validators
+PAGE_CACHE_TTL = 86400
+
+# Only the first rows of each listing are used, so there is no point
+# buffering arbitrarily large pages; lxml recovers a truncated document
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+FETCH_CHUNK_BYTES = 65536
+
+# raw_text is only useful for debugging selectors; serializing and storing
+# the source HTML of every row is skipped unless explicitly requested
+KEEP_RAW_TEXT = os.getenv("SCRAPER_KEEP_RAW_TEXT", "0") == "1"
+
+# Requests per second allowed against one host until its own rate-limit
+# headers say otherwise, and how often to retry a throttled/failing page
+DEFAULT_HOST_RATE = 4.0
+MAX_FETCH_ATTEMPTS = 4
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+class _TokenBucket:
+    """Per-host request budget, refilled continuously at `rate` per second
+
+    Replaces the old fixed sleep between sources: fast hosts are no longer
+    over-waited and slow ones are throttled to what they advertise.
+    """
+
+    def __init__(self, rate: float = DEFAULT_HOST_RATE):
+        self.rate = rate
+        self.capacity = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def observe(self, headers):
+        """Re-seed the budget from the server's X-RateLimit headers
+
+        Only ever throttles: the reseed needs both Remaining and a Reset
+        that yields a positive window, and the derived rate is capped at
+        the default - rate-limit headers must never accelerate a host
+        beyond what we would do anyway.
+        """
+        remaining = headers.get('X-RateLimit-Remaining')
+        if remaining is None:
+            return
+        try:
+            remaining = int(remaining)
+            window = float(headers.get('X-RateLimit-Reset', 0)) - time.time()
+        except ValueError:
+            return
+        if window <= 0:
+            return
+        self.rate = min(DEFAULT_HOST_RATE, max(0.1, remaining / window))
+        self.tokens = min(self.tokens, remaining)
+
+@functools.lru_cache(maxsize=None)
+def _xp(expr: str) -> etree.XPath:
+    """Compile an XPath expression once per process
+
+    element.xpath(str) re-parses the expression on every call; the handful
+    of expressions used here are compiled once and reused per element. The
+    cache is module-level (not stored on the source dicts) so it rebuilds
+    cleanly in worker processes.
+    """
+    return etree.XPath(expr)
+
+@functools.lru_cache(maxsize=None)
+def _selector_to_xpath(css: str) -> str:
+    """Translate the simple descendant CSS selectors used in TENDER_SOURCES
+    (e.g. 'table.list_table tr') into an equivalent XPath expression"""
+    steps = []
+    for token in css.split():
+        tag, _, cls = token.partition('.')
+        tag = tag or '*'
+        if cls:
+            steps.append(f"{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')]")
+        else:
+            steps.append(tag)
+    return '//' + '//'.join(steps)
+
+def _parse_html(content: bytes):
+    """Parse an HTML document with a dedicated parser instance
+
+    lxml's implicit default parser is shared module-wide and serialized
+    across threads; giving each call its own HTMLParser lets concurrent
+    workers parse in parallel while lxml's C code releases the GIL.
+    """
+    return lxml.html.fromstring(content, parser=lxml.html.HTMLParser())
+
+def _class_xpath(tag: str, cls: str) -> str:
+    """XPath matching a descendant tag with the given CSS class"""
+    return f".//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')]"
+
+# Field expressions for the source-specific extraction branches
+_DESC_P = _class_xpath('p', 'description')
+_AMOUNT_SPAN = _class_xpath('span', 'amount')
+_DEADLINE_SPAN = _class_xpath('span', 'deadline')
+_CARD_TITLE = _class_xpath('h3', 'card-title')
+_CARD_TEXT = _class_xpath('div', 'card-text')
+_BID_AMOUNT = _class_xpath('span', 'bid-amount')
+_CARD_LINK = _class_xpath('a', 'card-link') + '/@href'
+
+# Compiled once at import - these run per extracted tender, so the per-call
+# pattern cache lookup inside re.search is worth avoiding
+# Patterns like "Rs. 1,000,000" or "₹ 10.5 Lakhs" or "INR 5 Cr"
+_AMOUNT_RES = [
+    re.compile(r'(?:Rs\.?|₹|INR)\s*([\d,]+(?:\.\d+)?(?:\s*(?:lakhs?|crores?|cr))?)', re.IGNORECASE),
+    re.compile(r'([\d,]+(?:\.\d+)?)\s*(?:lakhs?|crores?|cr)', re.IGNORECASE),
+]
+
+# All amount and date alternatives fused into one pattern with named groups,
+# so one finditer pass replaces up to four independent scans of the same text.
+# amt_cur captures only the number - a unit suffix like "Rs. 10 Lakhs" is
+# consumed outside the group, since _convert_amount detects the unit from the
+# surrounding text and float() would choke on "10 Lakhs"
+_COMBINED = re.compile(
+    r'(?:Rs\.?|₹|INR)\s*(?P<amt_cur>[\d,]+(?:\.\d+)?)(?:\s*(?:lakhs?|crores?|cr))?'
+    r'|(?P<amt_unit>[\d,]+(?:\.\d+)?)\s*(?:lakhs?|crores?|cr)'
+    r'|(?P<date_num>\d{1,2}[/-]\d{1,2}[/-]\d{2,4})'
+    r'|(?P<date_name>\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{2,4})',
+    re.IGNORECASE
+)
+
+def _convert_amount(amount_str: str, lowered: str) -> Optional[float]:
+    """Convert a matched amount string, handling lakhs and crores"""
+    amount_str = amount_str.replace(',', '')
+    try:
+        if 'lakh' in lowered:
+            return float(amount_str) * 100000
+        elif 'cr' in lowered or 'crore' in lowered:
+            return float(amount_str) * 10000000
+        else:
+            return float(amount_str)
+    except ValueError:
+        return None
+
+@functools.lru_cache(maxsize=128)
+def _extract_amount(text: str) -> Optional[float]:
+    """Extract monetary amount from text (memoized - pure function of text)"""
+    lowered = text.lower()
+    for rx in _AMOUNT_RES:
+        match = rx.search(text)
+        if match:
+            amount = _convert_amount(match.group(1), lowered)
+            if amount is not None:
+                return amount
+    return None
+
+def _batch_extract_amount_and_date(texts: List[str]):
+    """Extract amounts and dates for many texts in one regex pass
+
+    The texts are joined with a sentinel and scanned with a single
+    finditer, which keeps the regex engine in C across the whole batch
+    instead of restarting it per row; each match is scattered back to its
+    row by bisecting its offset into the row start positions.
+    """
+    amounts: List[Optional[float]] = [None] * len(texts)
+    dates: List[Optional[str]] = [None] * len(texts)
+    if not texts:
+        return amounts, dates
+
+    starts = [0]
+    for text in texts:
+        starts.append(starts[-1] + len(text) + 1)
+    # NUL as the separator: unlike \x1e it is not regex whitespace, so no
+    # alternative in the fused pattern (\s* included) can consume it and
+    # matches can never straddle a row boundary
+    joined = '\x00'.join(texts)
+    lowered: List[Optional[str]] = [None] * len(texts)
+
+    for match in _COMBINED.finditer(joined):
+        i = bisect_right(starts, match.start()) - 1
+        kind = match.lastgroup
+        if kind in ('amt_cur', 'amt_unit'):
+            if amounts[i] is None:
+                if lowered[i] is None:
+                    lowered[i] = texts[i].lower()
+                amounts[i] = _convert_amount(match.group(kind), lowered[i])
+        elif dates[i] is None:
+            dates[i] = match.group(kind)
+
+    return amounts, dates
+
+def _parse_source_page(html: bytes, source: Dict) -> List[TenderSchema]:
+    """Parse the tenders out of one fetched listing page"""
+    scraped_tenders = []
+
+    try:
+        # Parse directly with lxml - element access then stays in C
+        # instead of going through bs4's Python tree
+        doc = _parse_html(html)
+
+        # Find tender listings using the source-specific selector
+        tender_elements = _xp(_selector_to_xpath(source['selector']))(doc)
+
+        rows = []
+        for index, element in enumerate(tender_elements[:20]):  # Limit to first 20 for testing
+            try:
+                # Extract tender details - these selectors will need to be adjusted per site
+                tender_data = _extract_tender_data(element, source)
+            except Exception as e:
+                logger.warning(f"Error processing tender element: {str(e)}")
+                continue
+
+            # Skip tenders with missing essential information
+            if tender_data.get('title') and tender_data.get('description'):
+                rows.append((index, element, tender_data))
+
+        # Rows that went through generic extraction still need their amount
+        # and deadline - scan them all in one batched regex pass
+        pending = [row for row in rows if '_scan_text' in row[2]]
+        amounts, dates = _batch_extract_amount_and_date([r[2].pop('_scan_text') for r in pending])
+        for (_, _, tender_data), amount, date in zip(pending, amounts, dates):
+            tender_data['amount'] = amount
+            tender_data['deadline'] = date
+
+        for index, element, tender_data in rows:
+            try:
+                # Create a TenderSchema object
+                tender = TenderSchema(
+                    id=f"{source['name'].lower().replace(' ', '-')}-{int(time.time())}-{index}",
+                    title=tender_data.get('title', ''),
+                    description=tender_data.get('description', ''),
+                    amount=tender_data.get('amount'),
+                    deadline=tender_data.get('deadline'),
+                    source=source['name'],
+                    url=tender_data.get('url', source['url']),
+                    category=tender_data.get('category'),
+                    department=tender_data.get('department'),
+                    location=tender_data.get('location'),
+                    publication_date=tender_data.get('publication_date'),
+                    raw_text=(lxml.html.tostring(element, encoding='unicode', with_tail=False)
+                              if KEEP_RAW_TEXT else None)
+                )
+
+                scraped_tenders.append(tender)
+
+            except Exception as e:
+                logger.warning(f"Error processing tender element: {str(e)}")
+                continue
+
+    except Exception as e:
+        logger.error(f"Error in scraping source {source['name']}: {str(e)}")
+
+    logger.info(f"Scraped {len(scraped_tenders)} tenders from {source['name']}")
+    return scraped_tenders
+
+def _extract_tender_data(element, source) -> Dict:
+    """Extract tender data from an lxml element - customize for each source"""
+    extractor = _get_extractor(source['name'])
+    if extractor is None:
+        # Generic extraction for other sources
+        return _generic_extract(element)
+    return extractor(element, source)
+
+# Field expressions per known source. All four follow the same shape -
+# four text probes plus a link - so instead of a handwritten function per
+# source, _get_extractor below compiles each spec into a specialized
+# extractor. Tamil Nadu and Maharashtra run the same NIC portal software,
+# so they share one spec.
+_NIC_TABLE_SPEC = {
+    'title': 'td[1]',
+    'description': 'td[2]',
+    'amount': 'td[3]',
+    'deadline': 'td[4]',
+    'link': './/a/@href',
+    'link_relative': True,
+}
+_FIELD_SPECS = {
+    "Tamil Nadu Tenders": _NIC_TABLE_SPEC,
+    "Maharashtra Tenders": _NIC_TABLE_SPEC,
+    "Central Public Procurement Portal": {
+        'title': './/h4',
+        'description': _DESC_P,
+        'amount': _AMOUNT_SPAN,
+        'deadline': _DEADLINE_SPAN,
+        'link': './/a/@href',
+        'link_relative': True,
+    },
+    "Government e-Marketplace": {
+        'title': _CARD_TITLE,
+        'description': _CARD_TEXT,
+        'amount': _BID_AMOUNT,
+        'deadline': _DEADLINE_SPAN,
+        'link': _CARD_LINK,
+        'link_relative': False,
+    },
+}
+
+# Body of a specialized extractor. The compiled XPath callables are bound
+# straight into the function's globals, so the per-element loop runs with
+# no name dispatch, no expression-cache lookups and no helper-call
+# indirection; only the url expression varies per spec.
+_EXTRACT_TEMPLATE = '''
+def extract(element, source):
+    nodes = _title(element)
+    title = nodes[0].text_content().strip() if nodes else None
+    nodes = _description(element)
+    description = nodes[0].text_content().strip() if nodes else None
+    nodes = _amount(element)
+    amount_text = nodes[0].text_content().strip() if nodes else None
+    nodes = _deadline(element)
+    deadline = nodes[0].text_content().strip() if nodes else None
+
+    # Fallback to generic extraction if specific selectors miss
+    if None in (title, description, amount_text, deadline):
+        return _generic_extract(element)
+
+    hrefs = _link(element)
+    return {{
+        'title': title,
+        'description': description,
+        'amount': _extract_amount(amount_text),
+        'deadline': deadline,
+        'url': {url_expr},
+    }}
+'''
+
+@functools.lru_cache(maxsize=None)
+def _get_extractor(name: str):
+    """Compile the specialized extractor for a source, once per process
+
+    Built lazily (not stored on the source dicts) so worker processes
+    regenerate their own copies - generated functions don't pickle.
+    """
+    spec = _FIELD_SPECS.get(name)
+    if spec is None:
+        return None
+
+    namespace = {
+        '_title': _xp(spec['title']),
+        '_description': _xp(spec['description']),
+        '_amount': _xp(spec['amount']),
+        '_deadline': _xp(spec['deadline']),
+        '_link': _xp(spec['link']),
+        '_generic_extract': _generic_extract,
+        '_extract_amount': _extract_amount,
+    }
+    url_expr = ("source['url'] + hrefs[0] if hrefs else source['url']"
+                if spec['link_relative']
+                else "hrefs[0] if hrefs else source['url']")
+    exec(_EXTRACT_TEMPLATE.format(url_expr=url_expr), namespace)
+    return namespace['extract']
+
+def _generic_extract(element) -> Dict:
+    """Generic extraction method for when specific selectors fail"""
+    tender_data = {}
+
+    # text_content() walks the whole subtree - do it once and reuse the
+    # result for the title fallback, description and regex scan below
+    text = element.text_content()
+    stripped = text.strip()
+
+    # Try to find title in any heading tag
+    headings = _xp('.//h1|.//h2|.//h3|.//h4|.//h5|.//h6')(element)
+    if headings:
+        tender_data['title'] = headings[0].text_content().strip()
+    else:
+        # Fallback to first significant text
+        tender_data['title'] = stripped[:100]
+
+    # Description - use all text content
+    tender_data['description'] = stripped
+
+    # Amount and deadline come from a regex scan of the element text;
+    # stash the text so the caller can run one batched pass over all
+    # generic rows instead of scanning each element separately
+    tender_data['_scan_text'] = text
+
+    # URL - find first link
+    hrefs = _xp('.//a/@href')(element)
+    if hrefs:
+        tender_data['url'] = hrefs[0]
+
+    return tender_data
+
+def _parse_source_page_packed(html: bytes, source: Dict) -> bytes:
+    """Worker-side wrapper: parse one page and msgpack the results
+
+    Pydantic models cross the pool boundary as pickled objects reconstructed
+    field by field; packing plain dicts with msgpack's C packer moves fewer
+    bytes and unpacks faster on the main side, which re-materializes them
+    with model_construct the same way the agents load persisted tenders.
+    """
+    tenders = _parse_source_page(html, source)
+    return msgpack.packb([tender.model_dump() for tender in tenders])
+
 class FirecrawlWrapper:
     """Wrapper class for FireCrawl to scrape government tender websites"""
-    
+
     def __init__(self):
         self.crawler = FireCrawl()
         self.sources = TENDER_SOURCES
-        
+
+        # One token bucket per host, created on first request to it
+        self._host_limits: Dict[str, _TokenBucket] = {}
+
+        # Page bodies keyed by URL along with their ETag/Last-Modified
+        # validators, so unchanged pages come back as a bodiless 304
+        self._page_cache = diskcache.Cache(os.path.join(VECTOR_DB_PATH, "page_cache"))
+
     def scrape_all_sources(self) -> List[TenderSchema]:
-        """Scrape tenders from all sources defined in config"""
-        all_tenders = []
-        
-        for source in self.sources:
-            try:
-                logger.info(f"Scraping tenders from {source['name']}")
-                source_tenders = self._scrape_source(source)
-                all_tenders.extend(source_tenders)
-                
-                # Add a small delay to avoid overwhelming servers
-                time.sleep(random.uniform(1, 3))
-            except Exception as e:
-                logger.error(f"Error scraping {source['name']}: {str(e)}")
-        
+        """Scrape tenders from all sources defined in config
+
+        Synchronous entry point kept for the agents; internally the sources
+        are fetched concurrently, so total wall time is roughly the slowest
+        single site instead of the sum of all of them.
+        """
+        all_tenders = asyncio.run(self._scrape_all_sources())
         logger.info(f"Scraped {len(all_tenders)} tenders in total")
         return all_tenders
-    
-    def _scrape_source(self, source: Dict) -> List[TenderSchema]:
-        """Scrape tenders from a specific source"""
-        scraped_tenders = []
-        
-        try:
-            # Use FireCrawl to get the page content
-            response = requests.get(source['url'])
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Find tender listings using the source-specific selector
-            tender_elements = soup.select(source['selector'])
-            
-            for index, element in enumerate(tender_elements[:20]):  # Limit to first 20 for testing
-                try:
-                    # Extract tender details - these selectors will need to be adjusted per site
-                    tender_data = self._extract_tender_data(element, source)
-                    
-                    # Skip tenders with missing essential information
-                    if not (tender_data.get('title') and tender_data.get('description')):
-                        continue
-                    
-                    # Create a TenderSchema object
-                    tender = TenderSchema(
-                        id=f"{source['name'].lower().replace(' ', '-')}-{int(time.time())}-{index}",
-                        title=tender_data.get('title', ''),
-                        description=tender_data.get('description', ''),
-                        amount=tender_data.get('amount'),
-                        deadline=tender_data.get('deadline'),
-                        source=source['name'],
-                        url=tender_data.get('url', source['url']),
-                        category=tender_data.get('category'),
-                        department=tender_data.get('department'),
-                        location=tender_data.get('location'),
-                        publication_date=tender_data.get('publication_date'),
-                        raw_text=str(element)
+
+    async def _scrape_all_sources(self) -> List[TenderSchema]:
+        """Fetch and scrape every source concurrently"""
+        all_tenders = []
+        semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+        # DNS answers are cached for the scrape cycle so retries and
+        # paginated fetches skip repeated resolution
+        connector = aiohttp.TCPConnector(limit_per_host=FETCH_CONCURRENCY, ttl_dns_cache=300)
+
+        # One pooled session for the whole scrape: repeated or paginated
+        # fetches from the same host reuse kept-alive connections instead
+        # of paying a new TCP/TLS handshake each time
+        async with aiohttp.ClientSession(
+            connector=connector,
+            timeout=FETCH_TIMEOUT,
+            headers={"Connection": "keep-alive"}
+        ) as session:
+            tasks = [
+                asyncio.create_task(self._fetch_source(session, semaphore, source))
+                for source in self.sources
+            ]
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        pages = []
+        page_sources = []
+        for source, result in zip(self.sources, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error scraping {source['name']}: {str(result)}")
+            else:
+                pages.append(result)
+                page_sources.append(source)
+
+        # Parsing is CPU-bound (lxml tree walks plus the regex extraction),
+        # so fan the fetched pages out to worker processes - each page is
+        # parsed on its own core instead of all of them queuing behind the
+        # GIL in this one
+        if pages:
+            with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+                for packed in pool.map(_parse_source_page_packed, pages, page_sources):
+                    all_tenders.extend(
+                        TenderSchema.model_construct(**record)
+                        for record in msgpack.unpackb(packed, raw=False)
                     )
-                    
-                    scraped_tenders.append(tender)
-                    
-                except Exception as e:
-                    logger.warning(f"Error processing tender element: {str(e)}")
-                    continue
-                    
-        except Exception as e:
-            logger.error(f"Error in scraping source {source['name']}: {str(e)}")
-        
-        logger.info(f"Scraped {len(scraped_tenders)} tenders from {source['name']}")
-        return scraped_tenders
-    
-    def _extract_tender_data(self, element, source) -> Dict:
-        """Extract tender data from HTML element - customize for each source"""
-        tender_data = {}
-        
-        # This is a simplified extraction - in production you'd need specific selectors for each site
-        if source['name'] == "Tamil Nadu Tenders":
-            try:
-                tender_data['title'] = element.select_one('td:nth-child(1)').text.strip()
-                tender_data['description'] = element.select_one('td:nth-child(2)').text.strip()
-                amount_text = element.select_one('td:nth-child(3)').text.strip()
-                tender_data['amount'] = self._extract_amount(amount_text)
-                tender_data['deadline'] = element.select_one('td:nth-child(4)').text.strip()
-                tender_data['url'] = source['url'] + element.select_one('a')['href'] if element.select_one('a') else source['url']
-            except:
-                # Fallback to generic extraction if specific selectors fail
-                tender_data = self._generic_extract(element)
-                
-        elif source['name'] == "Maharashtra Tenders":
-            # Similar extraction logic customized for Maharashtra site
-            try:
-                tender_data['title'] = element.select_one('td:nth-child(1)').text.strip()
-                tender_data['description'] = element.select_one('td:nth-child(2)').text.strip()
-                amount_text = element.select_one('td:nth-child(3)').text.strip()
-                tender_data['amount'] = self._extract_amount(amount_text)
-                tender_data['deadline'] = element.select_one('td:nth-child(4)').text.strip()
-                tender_data['url'] = source['url'] + element.select_one('a')['href'] if element.select_one('a') else source['url']
-            except:
-                tender_data = self._generic_extract(element)
-                
-        elif source['name'] == "Central Public Procurement Portal":
-            try:
-                tender_data['title'] = element.select_one('h4').text.strip()
-                tender_data['description'] = element.select_one('p.description').text.strip()
-                amount_text = element.select_one('span.amount').text.strip()
-                tender_data['amount'] = self._extract_amount(amount_text)
-                tender_data['deadline'] = element.select_one('span.deadline').text.strip()
-                tender_data['url'] = source['url'] + element.select_one('a')['href'] if element.select_one('a') else source['url']
-            except:
-                tender_data = self._generic_extract(element)
-                
-        elif source['name'] == "Government e-Marketplace":
-            try:
-                tender_data['title'] = element.select_one('h3.card-title').text.strip()
-                tender_data['description'] = element.select_one('div.card-text').text.strip()
-                amount_text = element.select_one('span.bid-amount').text.strip()
-                tender_data['amount'] = self._extract_amount(amount_text)
-                tender_data['deadline'] = element.select_one('span.deadline').text.strip()
-                tender_data['url'] = element.select_one('a.card-link')['href'] if element.select_one('a.card-link') else source['url']
-            except:
-                tender_data = self._generic_extract(element)
-        
-        else:
-            # Generic extraction for other sources
-            tender_data = self._generic_extract(element)
-            
-        return tender_data
-    
-    def _generic_extract(self, element) -> Dict:
-        """Generic extraction method for when specific selectors fail"""
-        tender_data = {}
-        
-        # Try to find title in any heading tag
-        headings = element.select('h1, h2, h3, h4, h5, h6')
-        if headings:
-            tender_data['title'] = headings[0].text.strip()
-        else:
-            # Fallback to first significant text
-            tender_data['title'] = element.get_text().strip()[:100]
-        
-        # Description - use all text content
-        tender_data['description'] = element.get_text().strip()
-        
-        # Look for amount patterns
-        text = element.get_text()
-        tender_data['amount'] = self._extract_amount(text)
-        
-        # Look for date patterns for deadline
-        tender_data['deadline'] = self._extract_date(text)
-        
-        # URL - find first link
-        link = element.select_one('a')
-        if link and link.has_attr('href'):
-            tender_data['url'] = link['href']
-            
-        return tender_data
-    
-    def _extract_amount(self, text: str) -> Optional[float]:
-        """Extract monetary amount from text"""
-        import re
-        # Look for patterns like "Rs. 1,000,000" or "₹ 10.5 Lakhs" or "INR 5 Cr"
-        amount_patterns = [
-            r'(?:Rs\.?|₹|INR)\s*([\d,]+(?:\.\d+)?(?:\s*(?:lakhs?|crores?|cr))?)',
-            r'([\d,]+(?:\.\d+)?)\s*(?:lakhs?|crores?|cr)'
-        ]
-        
-        for pattern in amount_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                amount_str = match.group(1).replace(',', '')
-                try:
-                    # Handle lakhs and crores conversion
-                    if 'lakh' in text.lower():
-                        return float(amount_str) * 100000
-                    elif 'cr' in text.lower() or 'crore' in text.lower():
-                        return float(amount_str) * 10000000
-                    else:
-                        return float(amount_str)
-                except ValueError:
-                    pass
-        return None
-    
-    def _extract_date(self, text: str) -> Optional[str]:
-        """Extract date from text"""
-        import re
-        date_patterns = [
-            r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',  # DD/MM/YYYY or DD-MM-YYYY
-            r'(\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{2,4})'  # DD Month YYYY
-        ]
-        
-        for pattern in date_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1)
-        return None
\ No newline at end of file
+
+        return all_tenders
+
+    async def _fetch_source(self, session: aiohttp.ClientSession,
+                            semaphore: asyncio.Semaphore, source: Dict) -> bytes:
+        """Fetch one source's listing page"""
+        logger.info(f"Scraping tenders from {source['name']}")
+        return await self._fetch_page(session, semaphore, source['url'])
+
+    async def _fetch_page(self, session: aiohttp.ClientSession,
+                          semaphore: asyncio.Semaphore, url: str) -> bytes:
+        """Fetch one page, revalidating the disk cache with a conditional GET"""
+        cached = self._page_cache.get(url)
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        bucket = self._host_limits.setdefault(urlsplit(url).netloc, _TokenBucket())
+
+        for attempt in range(MAX_FETCH_ATTEMPTS):
+            await bucket.acquire()
+            async with semaphore:
+                async with session.get(url, headers=headers or None) as response:
+                    bucket.observe(response.headers)
+
+                    if response.status in RETRYABLE_STATUSES:
+                        # Throttled or transient server error - back off
+                        # exponentially with jitter before retrying
+                        delay = min(60, 2 ** attempt + random.random())
+                        logger.warning(f"Got {response.status} from {url}, retrying in {delay:.1f}s")
+                        await asyncio.sleep(delay)
+                        continue
+
+                    if response.status == 304 and cached:
+                        # Unchanged since last scrape - no body was downloaded
+                        logger.info(f"Page unchanged, using cached copy: {url}")
+                        return cached['body']
+
+                    # Stream the body in chunks and stop at the size cap so one
+                    # huge page can't balloon the scrape's peak memory
+                    chunks = []
+                    size = 0
+                    async for chunk in response.content.iter_chunked(FETCH_CHUNK_BYTES):
+                        chunks.append(chunk)
+                        size += len(chunk)
+                        if size >= MAX_PAGE_BYTES:
+                            logger.warning(f"Truncating page at {MAX_PAGE_BYTES} bytes: {url}")
+                            break
+                    body = b''.join(chunks)
+
+            self._page_cache.set(url, {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'body': body,
+            }, expire=PAGE_CACHE_TTL)
+
+            return body
+
+        raise RuntimeError(f"Giving up on {url} after {MAX_FETCH_ATTEMPTS} attempts")